@@ -6,10 +6,10 @@ Toggles debug sections between commented and uncommented states.
 Usage:
     # CLI Mode
     python debug_toggle.py <file.ts> [--mode comment|uncomment|toggle] [--only tag1,tag2] [--except tag1,tag2]
-    python debug_toggle.py <directory> [--mode comment|uncomment|toggle] [--recursive] [--only tag1,tag2] [--except tag1,tag2]
+    python debug_toggle.py <directory> [--mode comment|uncomment|toggle] [--recursive] [--only tag1,tag2] [--except tag1,tag2] [--jobs N]
     
     # Watch Mode (Interactive)
-    python debug_toggle.py watch <directory> [--recursive]
+    python debug_toggle.py watch <directory> [--recursive] [--jobs N]
 
 Tags in TypeScript:
     // DEBUG START [tag]
@@ -19,198 +19,689 @@ Tags in TypeScript:
 """
 
 import sys
+import argparse
 import os
 import re
-import time
-from pathlib import Path
-from typing import List, Tuple, Set, Optional
+import functools
+import json
+import mmap
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from typing import List, Tuple, Set, Optional, Dict
 from datetime import datetime
 
+try:
+    # Optional: watchdog keeps watch mode's file list current from filesystem events
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+# A whole debug section: the START line (with its optional [tag]), an
+# optional /* line, the body, an optional */ line and the END line.
+# Matched in one pass over the file. The */ line is only split off when
+# the section was opened with /*, so a body that ends in its own */ keeps it.
+DEBUG_RE = re.compile(
+    rb'(?P<start>^[^\n]*?// DEBUG START(?:[ \t]*\[(?P<tag>[^\]\n]+)\])?[^\n]*\n)'
+    rb'(?P<opener>^[ \t]*/\*[ \t]*\r?\n)?'
+    rb'(?P<body>.*?)'
+    rb'(?(opener)(?P<closer>^[ \t]*\*/[ \t]*\r?\n)?)'
+    rb'(?P<end>^[^\n]*// DEBUG END[^\n]*)',
+    re.DOTALL | re.MULTILINE
+)
+
+# A DEBUG START line in raw file bytes, for tag scans that don't edit
+_START_LINE_RE = re.compile(rb'// DEBUG START[^\n]*')
+
+# Watch-mode command: <action> [tags] [in files] [except tags], where the
+# 'in' clause may also come after the 'except' one
+_WATCH_CMD_RE = re.compile(
+    r'^(?P<action>comment|uncomment|toggle|list|files|help|exit)'
+    r'(?:\s+(?P<tags>.+?))??'
+    r'(?:\s+in\s+(?P<files>.+?))?'
+    r'(?:\s+except\s+(?P<except>.+?))?'
+    r'(?:\s+in\s+(?P<files_after>.+?))?\s*$'
+)
+
+# Tag of a single DEBUG START line, e.g. "// DEBUG START [keep]" -> "keep"
+_TAG_RE = re.compile(r'//\s*DEBUG\s+START\s*\[([^\]]+)\]')
+
+# Cheap byte-level probe: files without it have nothing to toggle
+DEBUG_MARKER = b'// DEBUG START'
+
+# Batches of at least this many files are processed in a process pool;
+# smaller batches overlap their file I/O on threads instead. File I/O
+# mostly waits on storage, so use more threads than cores.
+PROCESS_POOL_THRESHOLD = 200
+IO_THREADS = min(32, (os.cpu_count() or 1) * 4)
+
+# Files smaller than this are read with a single os.read() instead of mmap
+MMAP_THRESHOLD = 256 * 1024
+
+# Directories never searched for .ts files in recursive mode
+SKIP_DIRS = {'node_modules', '.git', 'dist', 'build', '.next', 'out'}
+
+# Per-directory cache of path -> {mtime_ns, size, tags, sections, states};
+# persisted by watch mode only
+CACHE_FILENAME = '.debug_toggle_cache.json'
+_TAG_CACHE: Dict[str, dict] = {}
+
+@functools.lru_cache(maxsize=4096)
 def parse_debug_tag(line: str) -> Optional[str]:
     """Extract tag from DEBUG START line. Returns None if no tag, or the tag name."""
-    match = re.search(r'//\s*DEBUG\s+START\s*\[([^\]]+)\]', line)
+    match = _TAG_RE.search(line)
     if match:
         return match.group(1).strip()
     return None
 
-def process_file(filepath: str, mode: str = 'toggle', only_tags: Set[str] = None, except_tags: Set[str] = None) -> Tuple[bool, str, Set[str]]:
+def _valid_cache_entry(entry) -> bool:
+    """Whether a cache entry read from disk has the shape _cache_store writes."""
+    if not isinstance(entry, dict):
+        return False
+    if not all(isinstance(entry.get(k), int) for k in ('mtime_ns', 'size', 'sections')):
+        return False
+    tags = entry.get('tags')
+    if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+        return False
+    states = entry.get('states')
+    if states is None:
+        return True
+    return isinstance(states, list) and all(
+        isinstance(state, list) and len(state) == 2
+        and (state[0] is None or isinstance(state[0], str)) and isinstance(state[1], bool)
+        for state in states)
+
+def _load_cache(directory: str):
+    """Merge the on-disk tag cache of a directory into memory, ignoring malformed entries."""
+    try:
+        with open(os.path.join(directory, CACHE_FILENAME), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return
+    if isinstance(data, dict):
+        _TAG_CACHE.update((key, entry) for key, entry in data.items()
+                          if isinstance(key, str) and _valid_cache_entry(entry))
+
+def _save_cache(directory: str, ts_files: List[str]):
+    """Persist the tag cache entries of ts_files next to the files they describe."""
+    keep = {os.path.abspath(p) for p in ts_files}
+    entries = {key: entry for key, entry in _TAG_CACHE.items() if key in keep}
+    try:
+        _write_atomic(os.path.join(directory, CACHE_FILENAME), [json.dumps(entries).encode('utf-8')])
+    except OSError:
+        pass
+
+def _cache_lookup(key: str, st: os.stat_result) -> Optional[dict]:
+    """Return the cache entry for key if the file is unchanged since it was stored."""
+    entry = _TAG_CACHE.get(key)
+    if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+        return entry
+    return None
+
+def _cache_store(key: str, st: os.stat_result, tags: Set[str], sections: int,
+                 states: List[list] = None):
+    """Record a file's tags; states is [tag, commented] per section, if known."""
+    _TAG_CACHE[key] = {
+        'mtime_ns': st.st_mtime_ns,
+        'size': st.st_size,
+        'tags': sorted(tags),
+        'sections': sections,
+        'states': states
+    }
+
+def _cached_sections_change(entry: dict, mode: str, selects) -> bool:
+    """Whether a file with this (current) cache entry may need edits for mode."""
+    if entry['sections'] == 0:
+        return False
+    states = entry.get('states')
+    if states is None:
+        # Only the tags are known (e.g. from scan_tags), not the comment state
+        return True
+    return any(_flips(mode, commented) and (selects is None or selects(tag))
+               for tag, commented in states)
+
+def _read_debug_source(filepath: str) -> Optional[bytes]:
+    """Read a file's raw bytes, or return None if it has no DEBUG START marker."""
+    fd = os.open(filepath, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        size = os.fstat(fd).st_size
+        if size == 0:
+            return None
+        if size < MMAP_THRESHOLD:
+            # One read() of the known size beats setting up a mapping
+            content = os.read(fd, size)
+            return content if DEBUG_MARKER in content else None
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(DEBUG_MARKER) < 0:
+                return None
+            return mm[:]
+    finally:
+        os.close(fd)
+
+def _start_line_tags(content: bytes) -> Tuple[Set[str], int]:
+    """Tags of every DEBUG START line in content, ended or not, and the number of such lines."""
+    tags = set()
+    count = 0
+    for m in _START_LINE_RE.finditer(content, max(content.find(DEBUG_MARKER), 0)):
+        count += 1
+        tag = parse_debug_tag(m.group().decode('utf-8', 'replace'))
+        if tag:
+            tags.add(tag)
+    return tags, count
+
+def scan_tags(filepath: str) -> Set[str]:
+    """Collect the tags of a file's debug sections without processing it."""
+    key = os.path.abspath(filepath)
+    st = os.stat(filepath)
+    entry = _cache_lookup(key, st)
+    if entry is not None:
+        return set(entry['tags'])
+    
+    tags = set()
+    sections = 0
+    # Files without markers come back as None, so they never reach the regex
+    content = _read_debug_source(filepath)
+    if content is not None:
+        tags, sections = _start_line_tags(content)
+    
+    _cache_store(key, st, tags, sections)
+    return tags
+
+def _write_atomic(filepath: str, chunks: List[bytes]):
+    """Write chunks to a temp file next to filepath, then swap it into place."""
+    # Replace the link target, not a symlink itself, so links keep pointing at it
+    target = os.path.realpath(filepath)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target),
+                                    prefix='.debug-toggle-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.writelines(chunks)
+        if os.path.exists(target):
+            shutil.copymode(target, tmp_path)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def _comment_section(m) -> bytes:
+    """Wrap an uncommented section's body in /* ... */, matching its line endings."""
+    start = m.group('start')
+    newline = b'\r\n' if start.endswith(b'\r\n') else b'\n'
+    return start + b'/*' + newline + m.group('body') + b'*/' + newline + m.group('end')
+
+def _uncomment_section(m) -> bytes:
+    """Drop a commented section's /* line and the matching */ line."""
+    return m.group('start') + m.group('body') + m.group('end')
+
+def _keep_section(m) -> Optional[bytes]:
+    """Leave the section as it is."""
+    return None
+
+# (mode, currently commented) -> handler; missing pairs leave the section as-is
+_SECTION_HANDLERS = {
+    ('comment', False): _comment_section,
+    ('uncomment', True): _uncomment_section,
+    ('toggle', False): _comment_section,
+    ('toggle', True): _uncomment_section
+}
+
+def _flips(mode: str, commented: bool) -> bool:
+    """Whether mode changes a selected section that is currently (un)commented."""
+    return (mode, commented) in _SECTION_HANDLERS
+
+@functools.lru_cache(maxsize=32)
+def _tag_selector(only_tags: Optional[frozenset] = None, except_tags: Optional[frozenset] = None):
+    """Build the tag predicate for a filter, or None if every section is selected."""
+    if only_tags is None and except_tags is None:
+        return None
+    if except_tags is None:
+        return lambda tag: tag in only_tags
+    if only_tags is None:
+        return lambda tag: tag not in except_tags
+    return lambda tag: tag in only_tags and tag not in except_tags
+
+@functools.lru_cache(maxsize=32)
+def make_rewriter(mode: str, only_tags: Optional[frozenset] = None,
+                  except_tags: Optional[frozenset] = None):
+    """
+    Build a section rewriter specialized to one mode and tag filter.
+    
+    The returned function takes (tag, match) and gives the section's new
+    text, or None if it stays as-is. The mode and filter checks are
+    resolved here once, not for every section of every file.
+    """
+    # Index 0 handles uncommented sections, index 1 commented ones
+    handlers = (_SECTION_HANDLERS.get((mode, False), _keep_section),
+                _SECTION_HANDLERS.get((mode, True), _keep_section))
+    action = lambda m: handlers[m.group('opener') is not None](m)
+    selects = _tag_selector(only_tags, except_tags)
+    
+    if selects is None:
+        return lambda tag, m: action(m)
+    return lambda tag, m: action(m) if selects(tag) else None
+
+def _transform(content: bytes, mode: str, only_tags: Optional[frozenset] = None,
+               except_tags: Optional[frozenset] = None
+               ) -> Tuple[List[Tuple[int, int, bytes]], Set[str], List[list]]:
+    """
+    Work out the rewrites for one file's contents, without touching the disk.
+    
+    Returns:
+        Tuple of (edits as (start, end, replacement), tags found, [tag, commented] per section)
+    """
+    rewrite = make_rewriter(mode, only_tags, except_tags)
+    edits: List[Tuple[int, int, bytes]] = []
+    all_tags: Set[str] = set()
+    states: List[list] = []
+    
+    # Start the regex at the line holding the first marker; find() is a
+    # plain memory scan, so the prefix never goes through the regex engine
+    first_line = content.rfind(b'\n', 0, content.find(DEBUG_MARKER)) + 1
+    
+    for m in DEBUG_RE.finditer(content, first_line):
+        tag: Optional[str] = None
+        raw_tag = m.group('tag')
+        if raw_tag is not None:
+            tag = raw_tag.decode('utf-8', 'replace').strip()
+            if tag:
+                all_tags.add(tag)
+        replacement = rewrite(tag, m)
+        commented = m.group('opener') is not None
+        if replacement is not None:
+            edits.append((m.start(), m.end(), replacement))
+            commented = not commented
+        states.append([tag, commented])
+    
+    # A START without an END, or one swallowed into another section's body,
+    # isn't a match; report its tag anyway, the same way scan_tags does
+    if len(states) != content.count(DEBUG_MARKER):
+        all_tags = _start_line_tags(content)[0]
+    
+    return edits, all_tags, states
+
+def process_file(filepath: str, mode: str = 'toggle', only_tags: Optional[frozenset] = None,
+                 except_tags: Optional[frozenset] = None) -> Tuple[bool, str, Set[str]]:
     """
     Process a single TypeScript file to toggle debug sections.
     
     Args:
         filepath: Path to the .ts file
         mode: 'comment', 'uncomment', or 'toggle'
-        only_tags: Set of tags to process (None = all)
-        except_tags: Set of tags to skip (None = none)
+        only_tags: Frozenset of tags to process (None = all)
+        except_tags: Frozenset of tags to skip (None = none)
     
     Returns:
         Tuple of (success, message, all_tags_found)
     """
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
+        key = os.path.abspath(filepath)
+        st = os.stat(filepath)
+        if only_tags is not None:
+            only_tags = frozenset(only_tags)
+        if except_tags is not None:
+            except_tags = frozenset(except_tags)
         
-        original_content = content
-        lines = content.split('\n')
-        modified_lines = []
-        i = 0
-        changes_made = 0
-        all_tags = set()
+        entry = _cache_lookup(key, st)
+        if entry is not None and not _cached_sections_change(entry, mode, _tag_selector(only_tags, except_tags)):
+            # Unchanged since it was last seen, and none of its sections would flip
+            return True, f"○ No changes needed: {filepath}", set(entry['tags'])
         
-        while i < len(lines):
-            line = lines[i]
-            
-            # Check for DEBUG START
-            if '// DEBUG START' in line:
-                tag = parse_debug_tag(line)
-                if tag:
-                    all_tags.add(tag)
-                
-                # Check if we should process this section based on filters
-                should_process = True
-                if only_tags is not None:
-                    should_process = tag in only_tags
-                if except_tags is not None and tag in except_tags:
-                    should_process = False
-                
-                if not should_process:
-                    # Skip this section, keep as-is
-                    modified_lines.append(line)
-                    i += 1
-                    # Copy everything until DEBUG END
-                    while i < len(lines):
-                        modified_lines.append(lines[i])
-                        if '// DEBUG END' in lines[i]:
-                            i += 1
-                            break
-                        i += 1
-                    continue
-                
-                # Check if next line already has /*
-                if i + 1 < len(lines) and lines[i + 1].strip() == '/*':
-                    # Already commented
-                    if mode == 'uncomment' or mode == 'toggle':
-                        # Remove the /*
-                        modified_lines.append(line)
-                        i += 2  # Skip the /* line
-                        changes_made += 1
-                        
-                        # Find and remove the matching */
-                        while i < len(lines):
-                            if '// DEBUG END' in lines[i]:
-                                # Check if previous line has */
-                                if modified_lines and modified_lines[-1].strip() == '*/':
-                                    modified_lines.pop()  # Remove the */
-                                modified_lines.append(lines[i])
-                                i += 1
-                                break
-                            else:
-                                modified_lines.append(lines[i])
-                                i += 1
-                        continue
-                    else:
-                        # Keep as is (already commented, mode is 'comment')
-                        modified_lines.append(line)
-                        i += 1
-                else:
-                    # Not commented yet
-                    if mode == 'comment' or mode == 'toggle':
-                        # Add /*
-                        modified_lines.append(line)
-                        modified_lines.append('/*')
-                        i += 1
-                        changes_made += 1
-                        
-                        # Find DEBUG END and add */ before it
-                        while i < len(lines):
-                            if '// DEBUG END' in lines[i]:
-                                modified_lines.append('*/')
-                                modified_lines.append(lines[i])
-                                i += 1
-                                break
-                            else:
-                                modified_lines.append(lines[i])
-                                i += 1
-                        continue
-                    else:
-                        # Keep as is (not commented, mode is 'uncomment')
-                        modified_lines.append(line)
-                        i += 1
-            else:
-                modified_lines.append(line)
-                i += 1
+        content = _read_debug_source(filepath)
+        if content is None:
+            _cache_store(key, st, set(), 0, [])
+            return True, f"○ No changes needed: {filepath}", set()
         
-        new_content = '\n'.join(modified_lines)
+        edits, all_tags, states = _transform(content, mode, only_tags, except_tags)
+        sections = len(states)
         
-        if new_content != original_content:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-            return True, f"✓ Modified: {filepath} ({changes_made} debug section(s) toggled)", all_tags
-        else:
+        changes_made = len(edits)
+        if changes_made == 0:
+            _cache_store(key, st, all_tags, sections, states)
             return True, f"○ No changes needed: {filepath}", all_tags
+        
+        # Stream the untouched spans between edited sections straight from
+        # content; memoryview slices don't copy, and nothing joins them
+        view = memoryview(content)
+        parts = []
+        last = 0
+        for start, end, replacement in edits:
+            parts.append(view[last:start])
+            parts.append(replacement)
+            last = end
+        parts.append(view[last:])
+        _write_atomic(filepath, parts)
+        # Toggling never changes which tags a file has, so record them for 'list'
+        _cache_store(key, os.stat(filepath), all_tags, sections, states)
+        return True, f"✓ Modified: {filepath} ({changes_made} debug section(s) toggled)", all_tags
             
     except Exception as e:
         return False, f"✗ Error processing {filepath}: {str(e)}", set()
 
-def get_ts_files(directory: str, recursive: bool = False, file_filter: Set[str] = None) -> List[Path]:
-    """Get list of .ts files, optionally filtered."""
-    path = Path(directory)
+def _walk_ts_files(root: str, recursive: bool, dir_mtimes: Dict[str, int] = None):
+    """
+    Yield .ts file paths under root, skipping vendored/build directories.
+    
+    If dir_mtimes is given, it is filled with the mtime of every directory
+    visited, so callers can tell later whether the walk is still current.
+    """
+    # Explicit stack rather than recursion: no nested generators to pass
+    # every path through, and no recursion limit on deep trees
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            if dir_mtimes is not None:
+                dir_mtimes[current] = os.stat(current).st_mtime_ns
+            it = os.scandir(current)
+        except OSError:
+            # Unreadable, or removed mid-walk: skip it, as Path.glob did
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and entry.name not in SKIP_DIRS:
+                        stack.append(entry.path)
+                elif entry.name.endswith('.ts') and entry.is_file():
+                    yield entry.path
+
+def _dirs_unchanged(dir_mtimes: Optional[Dict[str, int]]) -> bool:
+    """True if none of the walked directories gained, lost or renamed an entry."""
+    if not dir_mtimes:
+        return False
+    try:
+        return all(os.stat(d).st_mtime_ns == mtime for d, mtime in dir_mtimes.items())
+    except OSError:
+        return False
+
+def filter_ts_files(ts_files: List[str], directory: str, file_filter: Set[str] = None) -> List[str]:
+    """Keep the .ts paths matching any of the file filters (all of them if no filter)."""
+    if not file_filter:
+        return ts_files
+    
+    # Normalize the filters once: remove quotes, skip empty entries, unify separators
+    items = set()
+    for filter_item in file_filter:
+        filter_item = filter_item.strip('"').strip("'")
+        if filter_item:
+            items.add(os.path.normpath(filter_item))
+    if not items:
+        return ts_files
+    names = frozenset(item.lower() for item in items)
+    paths = frozenset(items)
+    # "Filter is contained in the relative path" stays a check against every
+    # filter, as before; one alternation keeps that loop inside the regex engine
+    contained = re.compile('|'.join(map(re.escape, items)))
+    
+    # Walker paths start with directory + separator, so slice instead of relpath()
+    prefix = directory if directory.endswith(os.sep) else directory + os.sep
+    skip = len(prefix)
     
-    if not path.is_dir():
+    filtered = []
+    for f in ts_files:
+        rel_path = f[skip:] if f.startswith(prefix) else os.path.relpath(f, directory)
+        # Filename (any case) and full-path filters are hashed lookups
+        if (os.path.basename(f).lower() in names or
+            f in paths or
+            contained.search(rel_path)):
+            filtered.append(f)
+    return filtered
+
+def get_ts_files(directory: str, recursive: bool = False, file_filter: Set[str] = None) -> List[str]:
+    """Get list of .ts file paths, optionally filtered."""
+    if not os.path.isdir(directory):
         return []
     
-    pattern = "**/*.ts" if recursive else "*.ts"
-    all_files = list(path.glob(pattern))
+    return filter_ts_files(list(_walk_ts_files(directory, recursive)), directory, file_filter)
+
+class _TsFileIndex(FileSystemEventHandler):
+    """Live set of .ts paths under a directory, kept current by watchdog events."""
     
-    if file_filter:
-        # Filter files based on the filter set
-        filtered = []
-        for f in all_files:
-            filename = f.name
-            rel_path = str(f.relative_to(path))
-            abs_path = str(f)
-            
-            for filter_item in file_filter:
-                # Remove quotes if present
-                filter_item = filter_item.strip('"').strip("'")
-                
-                # Match against filename, relative path, or if filter is contained in path
-                if (filter_item == filename or 
-                    filter_item == rel_path or 
-                    filter_item == abs_path or
-                    filename.lower() == filter_item.lower() or
-                    rel_path.endswith(filter_item) or
-                    filter_item in rel_path):
-                    filtered.append(f)
-                    break
-        return filtered
-    
-    return all_files
+    def __init__(self, directory: str, recursive: bool):
+        super().__init__()
+        self.directory = directory
+        self.recursive = recursive
+        self._lock = threading.Lock()
+        self._files: Set[str] = set()
+        self.rescan()
+    
+    def rescan(self):
+        files = set(_walk_ts_files(self.directory, self.recursive))
+        with self._lock:
+            self._files = files
+    
+    def files(self, file_filter: Set[str] = None) -> List[str]:
+        with self._lock:
+            snapshot = sorted(self._files)
+        return filter_ts_files(snapshot, self.directory, file_filter)
+    
+    def _index_path(self, src_path) -> Optional[str]:
+        """Map an event path onto the walker's path form, or None if it isn't indexed."""
+        src_path = os.fsdecode(src_path)
+        if not src_path.endswith('.ts'):
+            return None
+        rel_path = os.path.relpath(src_path, self.directory)
+        parts = rel_path.split(os.sep)
+        if not self.recursive and len(parts) > 1:
+            return None
+        if any(part in SKIP_DIRS for part in parts[:-1]):
+            return None
+        return os.path.join(self.directory, rel_path)
+    
+    def _index_dir(self, src_path) -> Optional[str]:
+        """Map a directory event path onto the walker's path form, or None if it holds no indexed files."""
+        rel_path = os.path.relpath(os.fsdecode(src_path), self.directory)
+        if rel_path == os.curdir:
+            return self.directory
+        parts = rel_path.split(os.sep)
+        if not self.recursive or parts[0] == os.pardir:
+            return None
+        if any(part in SKIP_DIRS for part in parts):
+            return None
+        return os.path.join(self.directory, rel_path)
+    
+    def _add_dir(self, src_path):
+        path = self._index_dir(src_path)
+        if path == self.directory:
+            self.rescan()
+        elif path is not None:
+            files = set(_walk_ts_files(path, True))
+            with self._lock:
+                self._files |= files
+    
+    def _remove_dir(self, src_path):
+        path = self._index_dir(src_path)
+        if path == self.directory:
+            self.rescan()
+        elif path is not None:
+            prefix = path + os.sep
+            with self._lock:
+                gone = {f for f in self._files if f.startswith(prefix)}
+                self._files -= gone
+            for f in gone:
+                _TAG_CACHE.pop(os.path.abspath(f), None)
+    
+    def _add(self, src_path):
+        path = self._index_path(src_path)
+        if path is not None:
+            with self._lock:
+                self._files.add(path)
+    
+    def _remove(self, src_path):
+        path = self._index_path(src_path)
+        if path is not None:
+            with self._lock:
+                self._files.discard(path)
+            _TAG_CACHE.pop(os.path.abspath(path), None)
+    
+    # Directory events only touch the affected subtree, and ignore SKIP_DIRS,
+    # so an npm install doesn't turn into thousands of full walks
+    def on_created(self, event):
+        if event.is_directory:
+            self._add_dir(event.src_path)
+        else:
+            self._add(event.src_path)
+    
+    def on_deleted(self, event):
+        if event.is_directory:
+            self._remove_dir(event.src_path)
+        else:
+            self._remove(event.src_path)
+    
+    def on_moved(self, event):
+        if event.is_directory:
+            self._remove_dir(event.src_path)
+            self._add_dir(event.dest_path)
+        else:
+            self._remove(event.src_path)
+            self._add(event.dest_path)
+    
+    def on_modified(self, event):
+        if not event.is_directory:
+            path = self._index_path(event.src_path)
+            if path is not None:
+                _TAG_CACHE.pop(os.path.abspath(path), None)
 
-def process_directory(directory: str, mode: str = 'toggle', recursive: bool = False, 
-                     only_tags: Set[str] = None, except_tags: Set[str] = None,
-                     file_filter: Set[str] = None) -> Tuple[int, Set[str]]:
-    """Process all .ts files in a directory. Returns (success_count, all_tags)"""
-    ts_files = get_ts_files(directory, recursive, file_filter)
+def _process_file_batch(paths: List[str], mode: str, only_tags: Optional[frozenset],
+                        except_tags: Optional[frozenset]):
+    """Pool worker: process_file results for paths, each with the worker's cache entry for the parent."""
+    return [(process_file(p, mode, only_tags, except_tags), _TAG_CACHE.get(os.path.abspath(p)))
+            for p in paths]
+
+def _run_in_processes(executor: ProcessPoolExecutor, paths: List[str], mode: str,
+                      only_tags: Optional[frozenset], except_tags: Optional[frozenset],
+                      workers: int) -> list:
+    """
+    Run process_file over paths in a process pool, in batches.
     
+    Returns one entry per path: its result, or None if its batch was never
+    submitted (the pool broke first), so the caller can retry it. Batches that
+    were submitted but lost to a dead worker may already have been written,
+    so they are reported as failures instead.
+    """
+    size = max(1, len(paths) // (workers * 4))
+    results = [None] * len(paths)
+    with executor:
+        futures = []
+        for i in range(0, len(paths), size):
+            try:
+                future = executor.submit(_process_file_batch, paths[i:i + size], mode,
+                                         only_tags, except_tags)
+            except (OSError, RuntimeError):
+                # The pool is already broken; this batch stays unprocessed
+                future = None
+            futures.append((i, future))
+        
+        for i, future in futures:
+            if future is None:
+                continue
+            try:
+                batch = future.result()
+            except (OSError, BrokenProcessPool):
+                # Re-running these could toggle already written files back
+                for offset, path in enumerate(paths[i:i + size]):
+                    results[i + offset] = (False, f"✗ Error processing {path}: worker process died", set())
+                continue
+            # Workers have their own copy of the cache, fold their view back in
+            for offset, (result, entry) in enumerate(batch):
+                key = os.path.abspath(paths[i + offset])
+                if entry is None:
+                    _TAG_CACHE.pop(key, None)
+                else:
+                    _TAG_CACHE[key] = entry
+                results[i + offset] = result
+    return results
+
+def _run_in_threads(paths: List[str], mode: str, only_tags: Optional[frozenset],
+                    except_tags: Optional[frozenset]) -> list:
+    """Run process_file over paths on a thread pool, or directly for a single file."""
+    if len(paths) > 1:
+        # Reads and writes release the GIL, so threads hide the I/O latency
+        with ThreadPoolExecutor(max_workers=IO_THREADS) as executor:
+            return list(executor.map(process_file, paths, repeat(mode),
+                                     repeat(only_tags), repeat(except_tags)))
+    return [process_file(p, mode, only_tags, except_tags) for p in paths]
+
+def _run_process_file(paths: List[str], mode: str, only_tags: Optional[frozenset],
+                      except_tags: Optional[frozenset], jobs: Optional[int] = None):
+    """
+    Run process_file over paths.
+    
+    With jobs=None the batch size picks a thread or process pool; jobs=1 runs
+    serially and jobs>1 uses that many worker processes.
+    """
+    if jobs == 1:
+        return [process_file(p, mode, only_tags, except_tags) for p in paths]
+    if len(paths) > 1 and (jobs is not None or len(paths) >= PROCESS_POOL_THRESHOLD):
+        try:
+            executor = ProcessPoolExecutor(max_workers=jobs)
+        except (OSError, NotImplementedError):
+            # No multiprocessing support on this platform, fall back to threads
+            executor = None
+        if executor is not None:
+            results = _run_in_processes(executor, paths, mode, only_tags, except_tags,
+                                        jobs or os.cpu_count() or 1)
+            # Only batches that never reached a worker are retried
+            pending = [i for i, result in enumerate(results) if result is None]
+            retried = _run_in_threads([paths[i] for i in pending], mode, only_tags, except_tags)
+            for i, result in zip(pending, retried):
+                results[i] = result
+            return results
+    return _run_in_threads(paths, mode, only_tags, except_tags)
+
+def process_files(ts_files: List[str], mode: str = 'toggle', only_tags: Optional[frozenset] = None,
+                  except_tags: Optional[frozenset] = None, jobs: Optional[int] = None) -> Tuple[int, Set[str]]:
+    """Process the given .ts files. Returns (success_count, all_tags)"""
     if not ts_files:
         print(f"No .ts files found")
         return 0, set()
     
     print(f"Processing {len(ts_files)} TypeScript file(s)...\n")
     
+    # Frozensets are hashable and cheap to pickle for the worker processes
+    if only_tags is not None:
+        only_tags = frozenset(only_tags)
+    if except_tags is not None:
+        except_tags = frozenset(except_tags)
+    
     success_count = 0
     all_tags = set()
-    for ts_file in ts_files:
-        success, message, file_tags = process_file(str(ts_file), mode, only_tags, except_tags)
-        print(message)
+    # Collect the per-file lines and write them in one go rather than a print per file
+    messages = []
+    for success, message, file_tags in _run_process_file(ts_files, mode, only_tags, except_tags, jobs):
+        messages.append(message)
         all_tags.update(file_tags)
         if success:
             success_count += 1
+    sys.stdout.write('\n'.join(messages) + '\n')
     
     print(f"\n{success_count}/{len(ts_files)} files processed successfully")
     return success_count, all_tags
 
+def process_directory(directory: str, mode: str = 'toggle', recursive: bool = False, 
+                     only_tags: Optional[frozenset] = None, except_tags: Optional[frozenset] = None,
+                     file_filter: Set[str] = None, jobs: Optional[int] = None) -> Tuple[int, Set[str]]:
+    """Process all .ts files in a directory. Returns (success_count, all_tags)"""
+    ts_files = get_ts_files(directory, recursive, file_filter)
+    return process_files(ts_files, mode, only_tags, except_tags, jobs)
+
+def scan_files_tags(ts_files: List[str]) -> Dict[str, Set[str]]:
+    """Collect tags per file without processing. Returns {path: tags} for files with tags"""
+    file_tags_map = {}
+    for ts_file in ts_files:
+        try:
+            tags = scan_tags(ts_file)
+        except OSError:
+            continue
+        if tags:
+            file_tags_map[ts_file] = tags
+    return file_tags_map
+
 def parse_watch_command(cmd: str) -> dict:
     """
     Parse watch mode commands with flexible syntax.
@@ -232,48 +723,25 @@ def parse_watch_command(cmd: str) -> dict:
         'except_tags': None
     }
     
-    # Split by 'in' and 'except' keywords
-    parts = cmd.lower().split(' in ')
-    main_part = parts[0].strip()
-    
-    file_and_except = None
-    if len(parts) > 1:
-        file_and_except = parts[1].strip()
-    
-    # Parse main part (action + tags)
-    main_tokens = main_part.split(maxsplit=1)
-    if len(main_tokens) < 1:
+    match = _WATCH_CMD_RE.match(cmd.lower().strip())
+    if not match:
         return result
     
-    result['action'] = main_tokens[0]
+    result['action'] = match['action']
     
-    if len(main_tokens) > 1:
-        tag_part = main_tokens[1]
-        if tag_part != 'all':
-            result['tags'] = set(t.strip() for t in tag_part.split(','))
+    if match['tags'] and match['tags'] != 'all':
+        result['tags'] = frozenset(t.strip() for t in match['tags'].split(','))
     
-    # Parse file and except parts
-    if file_and_except:
-        if ' except ' in file_and_except:
-            file_part, except_part = file_and_except.split(' except ', 1)
-            result['files'] = set(f.strip() for f in file_part.split(','))
-            result['except_tags'] = set(t.strip() for t in except_part.split(','))
-        else:
-            result['files'] = set(f.strip() for f in file_and_except.split(','))
-    
-    # Check for except in main part (e.g., "comment all except tag1")
-    if ' except ' in main_part and result['except_tags'] is None:
-        main_part, except_part = main_part.split(' except ', 1)
-        result['except_tags'] = set(t.strip() for t in except_part.split(','))
-        # Re-parse main part
-        main_tokens = main_part.split(maxsplit=1)
-        result['action'] = main_tokens[0]
-        if len(main_tokens) > 1 and main_tokens[1] != 'all':
-            result['tags'] = set(t.strip() for t in main_tokens[1].split(','))
+    files = ','.join(f for f in (match['files'], match['files_after']) if f)
+    if files:
+        result['files'] = set(f.strip() for f in files.split(','))
+    
+    if match['except']:
+        result['except_tags'] = frozenset(t.strip() for t in match['except'].split(','))
     
     return result
 
-def watch_mode(directory: str, recursive: bool = False):
+def watch_mode(directory: str, recursive: bool = False, jobs: Optional[int] = None):
     """Interactive watch mode for processing files."""
     print(f"=== Debug Toggle - Watch Mode ===")
     print(f"Watching: {directory}")
@@ -295,6 +763,29 @@ def watch_mode(directory: str, recursive: bool = False):
     print(f"  exit                - Exit watch mode")
     print(f"\nReady for commands...\n")
     
+    _load_cache(directory)
+    
+    # With watchdog installed, keep a live file index instead of re-walking per command
+    index = None
+    observer = None
+    if Observer is not None:
+        index = _TsFileIndex(directory, recursive)
+        observer = Observer()
+        observer.schedule(index, directory, recursive=recursive)
+        observer.start()
+    
+    # Without it, reuse the last walk until a directory in the tree changes
+    walk = {'files': [], 'dir_mtimes': None}
+    
+    def list_ts_files(file_filter: Set[str] = None) -> List[str]:
+        if index is not None:
+            return index.files(file_filter)
+        if not _dirs_unchanged(walk['dir_mtimes']):
+            dir_mtimes = {}
+            walk['files'] = sorted(_walk_ts_files(directory, recursive, dir_mtimes))
+            walk['dir_mtimes'] = dir_mtimes
+        return filter_ts_files(walk['files'], directory, file_filter)
+    
     while True:
         try:
             cmd = input("> ").strip()
@@ -330,10 +821,10 @@ def watch_mode(directory: str, recursive: bool = False):
             
             if cmd_lower == 'files':
                 print("\n📁 TypeScript files:")
-                ts_files = get_ts_files(directory, recursive)
+                ts_files = list_ts_files()
                 if ts_files:
                     for f in sorted(ts_files):
-                        rel_path = f.relative_to(Path(directory))
+                        rel_path = os.path.relpath(f, directory)
                         print(f"  • {rel_path}")
                     print(f"\nTotal: {len(ts_files)} files")
                 else:
@@ -348,23 +839,18 @@ def watch_mode(directory: str, recursive: bool = False):
                     file_filter = set(f.strip() for f in files_part.split(','))
                 
                 print("\n🔍 Scanning for tags...")
-                ts_files = get_ts_files(directory, recursive, file_filter)
+                ts_files = list_ts_files(file_filter)
                 
                 if not ts_files:
                     print("No .ts files found")
                     print()
                     continue
                 
-                all_tags = set()
-                file_tags_map = {}
-                
-                for ts_file in ts_files:
-                    _, _, tags = process_file(str(ts_file), mode='toggle', 
-                                             only_tags=set(), except_tags=set(['__dummy__']))
-                    if tags:
-                        rel_path = ts_file.relative_to(Path(directory))
-                        file_tags_map[str(rel_path)] = tags
-                        all_tags.update(tags)
+                file_tags_map = {
+                    os.path.relpath(ts_file, directory): tags
+                    for ts_file, tags in scan_files_tags(ts_files).items()
+                }
+                all_tags = set().union(*file_tags_map.values())
                 
                 if all_tags:
                     print(f"\n🏷️  All tags: {', '.join(sorted(all_tags))}\n")
@@ -401,13 +887,12 @@ def watch_mode(directory: str, recursive: bool = False):
             
             print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Executing: {' | '.join(desc_parts)}")
             
-            success_count, all_tags = process_directory(
-                directory, 
+            success_count, all_tags = process_files(
+                list_ts_files(parsed['files']),
                 mode=parsed['action'], 
-                recursive=recursive, 
                 only_tags=parsed['tags'],
                 except_tags=parsed['except_tags'],
-                file_filter=parsed['files']
+                jobs=jobs
             )
             print()
             
@@ -419,57 +904,77 @@ def watch_mode(directory: str, recursive: bool = False):
             break
         except Exception as e:
             print(f"❌ Error: {str(e)}\n")
+    
+    if observer is not None:
+        observer.stop()
+        observer.join()
+    # Only files still in the tree are kept, so deleted files don't pile up
+    _save_cache(directory, list_ts_files())
+
+def _positive_int(value: str) -> int:
+    """argparse type for --jobs."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}")
+    return number
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """Parse CLI arguments; 'watch' as the first argument selects watch mode."""
+    if argv and argv[0] == 'watch':
+        parser = argparse.ArgumentParser(prog=f"{os.path.basename(sys.argv[0])} watch",
+                                         description="Interactive watch mode")
+        parser.add_argument('directory', help="Directory to watch")
+        parser.add_argument('-r', '--recursive', action='store_true', help="Include subdirectories")
+        parser.add_argument('-j', '--jobs', type=_positive_int, metavar='N',
+                            help="Worker processes per command (default: auto)")
+        args = parser.parse_args(argv[1:])
+        args.command = 'watch'
+        return args
+    
+    parser = argparse.ArgumentParser(description="Toggle debug sections in TypeScript files")
+    parser.add_argument('target', help="A .ts file or a directory")
+    parser.add_argument('--mode', choices=['comment', 'uncomment', 'toggle'], default='toggle')
+    parser.add_argument('-r', '--recursive', action='store_true', help="Include subdirectories")
+    parser.add_argument('--only', metavar='TAGS', help="Comma-separated tags to process")
+    parser.add_argument('--except', dest='except_tags', metavar='TAGS', help="Comma-separated tags to skip")
+    parser.add_argument('-j', '--jobs', type=_positive_int, metavar='N',
+                        help="Worker processes for directories (default: auto)")
+    args = parser.parse_args(argv)
+    args.command = 'cli'
+    return args
 
 def main():
     if len(sys.argv) < 2:
         print(__doc__)
         sys.exit(1)
     
+    args = parse_args(sys.argv[1:])
+    
     # Check for watch mode
-    if sys.argv[1] == 'watch':
-        if len(sys.argv) < 3:
-            print("Error: watch mode requires a directory")
-            print("Usage: python debug_toggle.py watch <directory> [--recursive]")
-            sys.exit(1)
-        
-        directory = sys.argv[2]
-        recursive = '--recursive' in sys.argv or '-r' in sys.argv
-        
+    if args.command == 'watch':
+        directory = args.directory
         if not os.path.isdir(directory):
             print(f"Error: {directory} is not a directory")
             sys.exit(1)
         
-        watch_mode(directory, recursive)
+        watch_mode(directory, args.recursive, args.jobs)
         sys.exit(0)
     
     # CLI mode
-    target = sys.argv[1]
-    mode = 'toggle'
-    recursive = False
+    target = args.target
+    mode = args.mode
+    recursive = args.recursive
     only_tags = None
     except_tags = None
     
-    # Parse arguments
-    if '--mode' in sys.argv:
-        mode_index = sys.argv.index('--mode')
-        if mode_index + 1 < len(sys.argv):
-            mode = sys.argv[mode_index + 1]
-            if mode not in ['comment', 'uncomment', 'toggle']:
-                print("Error: mode must be 'comment', 'uncomment', or 'toggle'")
-                sys.exit(1)
-    
-    if '--recursive' in sys.argv or '-r' in sys.argv:
-        recursive = True
-    
-    if '--only' in sys.argv:
-        only_index = sys.argv.index('--only')
-        if only_index + 1 < len(sys.argv):
-            only_tags = set(tag.strip() for tag in sys.argv[only_index + 1].split(','))
+    if args.only is not None:
+        only_tags = frozenset(tag.strip() for tag in args.only.split(','))
     
-    if '--except' in sys.argv:
-        except_index = sys.argv.index('--except')
-        if except_index + 1 < len(sys.argv):
-            except_tags = set(tag.strip() for tag in sys.argv[except_index + 1].split(','))
+    if args.except_tags is not None:
+        except_tags = frozenset(tag.strip() for tag in args.except_tags.split(','))
     
     # Process target
     if os.path.isfile(target):
@@ -482,7 +987,7 @@ def main():
             print(f"Tags found: {', '.join(sorted(tags))}")
         sys.exit(0 if success else 1)
     elif os.path.isdir(target):
-        success_count, tags = process_directory(target, mode, recursive, only_tags, except_tags)
+        success_count, tags = process_directory(target, mode, recursive, only_tags, except_tags, jobs=args.jobs)
         if tags:
             print(f"\nAll tags found: {', '.join(sorted(tags))}")
         sys.exit(0 if success_count > 0 else 1)